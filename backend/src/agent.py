@@ -14,19 +14,12 @@
 # ======================================================
 
 import logging
-import json
 import os
 import asyncio
 from datetime import datetime
 from typing import Annotated, Literal
 from dataclasses import dataclass, field
 
-print("\n" + "🎯" * 50)
-print("🚀 COFFEE SHOP AGENT - TUTORIAL BY DR. ABHISHEK")
-print("📚 SUBSCRIBE: https://www.youtube.com/@drabhishek.5460/videos")
-print("💡 agent.py LOADED SUCCESSFULLY!")
-print("🎯" * 50 + "\n")
-
 from dotenv import load_dotenv
 from pydantic import Field
 from livekit.agents import (
@@ -37,7 +30,6 @@ from livekit.agents import (
     RoomInputOptions,
     WorkerOptions,
     cli,
-    tokenize,
     metrics,
     MetricsCollectedEvent,
     RunContext,
@@ -47,53 +39,18 @@ from livekit.agents import (
 from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
 from livekit.plugins.turn_detector.multilingual import MultilingualModel
 
+from order_state import CoffeeOrder, encode_order
+
 logger = logging.getLogger("agent")
 load_dotenv(".env.local")
 
 # ======================================================
 # 🛒 ORDER MANAGEMENT SYSTEM
 # ======================================================
-@dataclass
-class OrderState:
-    """☕ Coffee shop order state with validation"""
-    drinkType: str | None = None
-    size: str | None = None
-    milk: str | None = None
-    extras: list[str] = field(default_factory=list)
-    name: str | None = None
-    
-    def is_complete(self) -> bool:
-        """✅ Check if all required fields are filled"""
-        return all([
-            self.drinkType is not None,
-            self.size is not None,
-            self.milk is not None,
-            self.extras is not None,
-            self.name is not None
-        ])
-    
-    def to_dict(self) -> dict:
-        """📦 Convert to dictionary for JSON serialization"""
-        return {
-            "drinkType": self.drinkType,
-            "size": self.size,
-            "milk": self.milk,
-            "extras": self.extras,
-            "name": self.name
-        }
-    
-    def get_summary(self) -> str:
-        """📋 Get friendly order summary"""
-        if not self.is_complete():
-            return "🔄 Order in progress..."
-        
-        extras_text = f" with {', '.join(self.extras)}" if self.extras else ""
-        return f"☕ {self.size.upper()} {self.drinkType.title()} with {self.milk.title()} milk{extras_text} for {self.name}"
-
-@dataclass
+@dataclass(slots=True)
 class Userdata:
     """👤 User session data"""
-    order: OrderState
+    order: CoffeeOrder
     session_start: datetime = field(default_factory=datetime.now)
 
 # ======================================================
@@ -191,18 +148,27 @@ async def complete_order(ctx: RunContext[Userdata]) -> str:
     
     print(f"🎉 ORDER READY FOR COMPLETION: {order.get_summary()}")
     
+    # 📸 Snapshot on the event loop - tool calls running while the save is in
+    # the worker thread can't change what gets written or confirmed
+    order_data = order.to_dict()
+
     try:
-        save_order_to_json(order)
-        extras_text = f" with {', '.join(order.extras)}" if order.extras else ""
+        # 🧵 Disk I/O runs in a worker thread so audio streaming isn't stalled
+        await asyncio.to_thread(save_order_to_json, order_data)
+        extras = order_data["extras"]
+        extras_text = f" with {', '.join(extras)}" if extras else ""
+        size, drink, milk, name = (
+            order_data["size"], order_data["drinkType"], order_data["milk"], order_data["name"]
+        )
         
         print("\n" + "⭐" * 60)
         print("🎉 ORDER COMPLETED SUCCESSFULLY!")
-        print(f"👤 Customer: {order.name}")
-        print(f"☕ Order: {order.size} {order.drinkType} with {order.milk} milk{extras_text}")
+        print(f"👤 Customer: {name}")
+        print(f"☕ Order: {size} {drink} with {milk} milk{extras_text}")
         print("📺 Tutorial by Dr. Abhishek - SUBSCRIBE NOW!")
         print("⭐" * 60 + "\n")
         
-        return f"""🎉 PERFECT! Your {order.size} {order.drinkType} with {order.milk} milk{extras_text} is confirmed, {order.name}! 
+        return f"""🎉 PERFECT! Your {size} {drink} with {milk} milk{extras_text} is confirmed, {name}! 
 
 ⏰ We're preparing your drink now - it'll be ready in 3-5 minutes!
 
@@ -268,40 +234,40 @@ class BaristaAgent(Agent):
 
 def create_empty_order():
     """🆕 Create a fresh order state"""
-    return OrderState()
+    return CoffeeOrder()
 
 # ======================================================
 # 💾 ORDER STORAGE & PERSISTENCE
 # ======================================================
-def get_orders_folder():
-    """📁 Get the orders directory path"""
-    base_dir = os.path.dirname(__file__)   # src/
-    backend_dir = os.path.abspath(os.path.join(base_dir, ".."))
-    folder = os.path.join(backend_dir, "orders")
-    os.makedirs(folder, exist_ok=True)
-    return folder
-
-def save_order_to_json(order: OrderState) -> str:
-    """💾 Save order to JSON file with enhanced logging"""
+# 📁 Resolved once at import - the backend/orders path never changes at runtime
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+ORDERS_DIR = os.path.join(BACKEND_DIR, "orders")
+os.makedirs(ORDERS_DIR, exist_ok=True)
+
+def save_order_to_json(order_data: dict) -> str:
+    """💾 Save an order snapshot (CoffeeOrder.to_dict()) to JSON with enhanced logging"""
     print(f"\n🔄 ATTEMPTING TO SAVE ORDER...")
-    folder = get_orders_folder()
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # 🕒 One clock read so the filename and stored timestamp always agree
+    now = datetime.now()
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     filename = f"order_{timestamp}.json"
-    path = os.path.join(folder, filename)
+    path = os.path.join(ORDERS_DIR, filename)
 
     try:
-        order_data = order.to_dict()
-        order_data["timestamp"] = datetime.now().isoformat()
-        order_data["session_id"] = f"session_{timestamp}"
+        record = {
+            **order_data,
+            "timestamp": now.isoformat(),
+            "session_id": f"session_{timestamp}",
+        }
         
-        with open(path, "w", encoding='utf-8') as f:
-            json.dump(order_data, f, indent=4, ensure_ascii=False)
+        with open(path, "wb") as f:
+            f.write(encode_order(record))
         
         print("\n" + "✅" * 30)
         print("🎉 ORDER SAVED SUCCESSFULLY!")
         print(f"📁 Location: {path}")
-        print(f"👤 Customer: {order.name}")
-        print(f"☕ Order: {order.get_summary()}")
+        print(f"👤 Customer: {order_data['name']}")
+        print(f"☕ Order: {order_data['size']} {order_data['drinkType']} with {order_data['milk']} milk")
         print("📺 Tutorial by: Dr. Abhishek - SUBSCRIBE!")
         print("✅" * 30 + "\n")
         
@@ -320,7 +286,7 @@ def test_order_saving():
     """🧪 Test function to verify order saving works"""
     print("\n🧪 RUNNING ORDER SAVING TEST...")
     
-    test_order = OrderState()
+    test_order = CoffeeOrder()
     test_order.drinkType = "latte"
     test_order.size = "medium"
     test_order.milk = "oat"
@@ -328,7 +294,7 @@ def test_order_saving():
     test_order.name = "TestCustomer"
     
     try:
-        path = save_order_to_json(test_order)
+        path = save_order_to_json(test_order.to_dict())
         print(f"🎯 TEST RESULT: ✅ SUCCESS - Saved to {path}")
         return True
     except Exception as e:
@@ -355,13 +321,10 @@ async def entrypoint(ctx: JobContext):
     print("🚀 BREW & BEAN CAFE - AI BARISTA")
     print("👨‍⚕️ Tutorial by Dr. Abhishek")
     print("📺 YouTube: https://www.youtube.com/@drabhishek.5460/videos")
-    print("📁 Orders folder:", get_orders_folder())
+    print("📁 Orders folder:", ORDERS_DIR)
     print("🎤 Ready to take customer orders!")
     print("🏪" * 25 + "\n")
 
-    # Run test to verify everything works
-    test_order_saving()
-
     # Create user session data with empty order
     userdata = Userdata(order=create_empty_order())
     
@@ -369,6 +332,10 @@ async def entrypoint(ctx: JobContext):
     print(f"\n🆕 NEW CUSTOMER SESSION: {session_id}")
     print(f"📝 Initial order state: {userdata.order.get_summary()}\n")
 
+    # Run test to verify everything works - its one file write happens in a
+    # worker thread while session.start() is awaited below
+    self_test = asyncio.create_task(asyncio.to_thread(test_order_saving))
+
     # Create session with userdata
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
@@ -397,12 +364,20 @@ async def entrypoint(ctx: JobContext):
         ),
     )
 
+    await self_test
+
     await ctx.connect()
 
 # ======================================================
 # ⚡ APPLICATION BOOTSTRAP & LAUNCH
 # ======================================================
 if __name__ == "__main__":
+    print("\n" + "🎯" * 50)
+    print("🚀 COFFEE SHOP AGENT - TUTORIAL BY DR. ABHISHEK")
+    print("📚 SUBSCRIBE: https://www.youtube.com/@drabhishek.5460/videos")
+    print("💡 agent.py LOADED SUCCESSFULLY!")
+    print("🎯" * 50 + "\n")
+
     print("\n" + "⚡" * 25)
     print("🎬 STARTING COFFEE SHOP AGENT...")
     print("👨‍⚕️ Developed from Dr. Abhishek's Tutorial")
@@ -1,10 +1,15 @@
 """Order state management for coffee shop barista agent."""
 
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from typing import Optional
 
+import orjson
 
-@dataclass
+# Fields that must be set before an order can be completed, in prompt order.
+REQUIRED_FIELDS = ("drinkType", "size", "milk", "name")
+
+
+@dataclass(slots=True)
 class CoffeeOrder:
     """Represents a coffee order with all required fields."""
     drinkType: Optional[str] = None
@@ -24,17 +29,27 @@ class CoffeeOrder:
 
     def get_missing_fields(self) -> list[str]:
         """Get list of missing required fields."""
-        missing = []
-        if self.drinkType is None:
-            missing.append("drinkType")
-        if self.size is None:
-            missing.append("size")
-        if self.milk is None:
-            missing.append("milk")
-        if self.name is None:
-            missing.append("name")
-        return missing
+        return [name for name in REQUIRED_FIELDS if getattr(self, name) is None]
+
+    def get_summary(self) -> str:
+        """Get a friendly one-line summary of the order."""
+        if not self.is_complete():
+            return "🔄 Order in progress..."
+
+        extras_text = f" with {', '.join(self.extras)}" if self.extras else ""
+        return f"☕ {self.size.upper()} {self.drinkType.title()} with {self.milk.title()} milk{extras_text} for {self.name}"
 
     def to_dict(self) -> dict:
         """Convert order to dictionary for JSON serialization."""
-        return asdict(self)
+        return {
+            "drinkType": self.drinkType,
+            "size": self.size,
+            "milk": self.milk,
+            "extras": list(self.extras),
+            "name": self.name,
+        }
+
+
+def encode_order(order_data: dict) -> bytes:
+    """Encode order data as pretty-printed UTF-8 JSON."""
+    return orjson.dumps(order_data, option=orjson.OPT_INDENT_2)
@@ -0,0 +1,74 @@
+import json
+
+from order_state import CoffeeOrder, encode_order
+
+
+def _complete_order() -> CoffeeOrder:
+    return CoffeeOrder(
+        drinkType="latte",
+        size="medium",
+        milk="oat",
+        extras=["extra shot", "vanilla"],
+        name="Ada",
+    )
+
+
+def test_to_dict_keys_and_order() -> None:
+    """to_dict() emits the order fields in the documented order-state shape."""
+    data = _complete_order().to_dict()
+
+    assert list(data) == ["drinkType", "size", "milk", "extras", "name"]
+    assert data == {
+        "drinkType": "latte",
+        "size": "medium",
+        "milk": "oat",
+        "extras": ["extra shot", "vanilla"],
+        "name": "Ada",
+    }
+
+
+def test_to_dict_copies_extras() -> None:
+    """Mutating the snapshot's extras must not touch the live order."""
+    order = _complete_order()
+    data = order.to_dict()
+
+    assert data["extras"] is not order.extras
+    data["extras"].append("honey")
+    assert order.extras == ["extra shot", "vanilla"]
+
+
+def test_get_missing_fields_order() -> None:
+    """Missing fields are reported in prompt order, skipping the filled ones."""
+    assert CoffeeOrder().get_missing_fields() == ["drinkType", "size", "milk", "name"]
+    assert CoffeeOrder(size="small", name="Ada").get_missing_fields() == [
+        "drinkType",
+        "milk",
+    ]
+    assert _complete_order().get_missing_fields() == []
+
+
+def test_get_summary_incomplete() -> None:
+    """An incomplete order only reports that it is in progress."""
+    assert CoffeeOrder(drinkType="mocha").get_summary() == "🔄 Order in progress..."
+
+
+def test_get_summary_complete() -> None:
+    """A complete order summarises size, drink, milk, extras and name."""
+    assert (
+        _complete_order().get_summary()
+        == "☕ MEDIUM Latte with Oat milk with extra shot, vanilla for Ada"
+    )
+
+    order = _complete_order()
+    order.extras = []
+    assert order.get_summary() == "☕ MEDIUM Latte with Oat milk for Ada"
+
+
+def test_encode_order() -> None:
+    """encode_order() writes 2-space indented UTF-8 JSON that round-trips."""
+    data = {**_complete_order().to_dict(), "name": "José"}
+    encoded = encode_order(data)
+
+    assert isinstance(encoded, bytes)
+    assert encoded == json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    assert json.loads(encoded) == data